@@ -17,6 +17,13 @@ class Settings(BaseSettings):
     gemini_model: str = "gemini-2.5-flash"
     gemini_timeout: float = 30.0
     
+    # Geo Cache Config (consultas por coordenadas)
+    geo_cache_mode: str = "geohash"          # "geohash" o "grid"
+    geo_cache_geohash_precision: int = 5     # ~4.9 km x 4.9 km por celda
+    geo_cache_grid_degrees: float = 0.05     # tamaño de celda en modo "grid"
+    geo_cache_ttl_seconds: float = 600
+    geo_cache_max_entries: int = 10000
+    
     # App Config
     app_name: str = "Weather Analysis API"
     app_version: str = "1.0.0"
@@ -6,6 +6,7 @@ from app.models.schemas import (
     Coordinates,
     Metadata,
     AIAnalysis,
+    NearestLocationResponse,
     ErrorResponse
 )
 
@@ -17,5 +18,6 @@ __all__ = [
     "Coordinates",
     "Metadata",
     "AIAnalysis",
+    "NearestLocationResponse",
     "ErrorResponse"
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 from datetime import datetime
 
@@ -8,15 +8,39 @@ from datetime import datetime
 class WeatherRequest(BaseModel):
     """Schema para solicitud de análisis de clima."""
     
-    city: str = Field(..., min_length=1, max_length=100, examples=["La Paz"])
+    city: Optional[str] = Field(None, min_length=1, max_length=100, examples=["La Paz"])
     country: Optional[str] = Field(None, min_length=2, max_length=2, examples=["BO"])
+    lat: Optional[float] = Field(None, ge=-90, le=90, examples=[-16.5])
+    lon: Optional[float] = Field(None, ge=-180, le=180, examples=[-68.15])
+    
+    @model_validator(mode="after")
+    def check_location(self) -> "WeatherRequest":
+        """Requiere ciudad o el par completo de coordenadas, sin mezclarlos."""
+        if (self.lat is None) != (self.lon is None):
+            raise ValueError("lat y lon deben enviarse juntos")
+        if self.city is None and self.lat is None:
+            raise ValueError("Se requiere city o el par lat/lon")
+        if self.lat is not None and (self.city is not None or self.country is not None):
+            raise ValueError("Enviar city/country o lat/lon, no ambos")
+        return self
+    
+    @property
+    def has_coordinates(self) -> bool:
+        """Indica si la solicitud es por coordenadas."""
+        return self.lat is not None and self.lon is not None
     
     class Config:
         json_schema_extra = {
-            "example": {
-                "city": "La Paz",
-                "country": "BO"
-            }
+            "examples": [
+                {
+                    "city": "La Paz",
+                    "country": "BO"
+                },
+                {
+                    "lat": -16.5,
+                    "lon": -68.15
+                }
+            ]
         }
 
 
@@ -31,7 +55,7 @@ class Coordinates(BaseModel):
 class Location(BaseModel):
     """Información de ubicación."""
     city: str
-    country: str
+    country: Optional[str] = None
     coordinates: Coordinates
 
 
@@ -62,6 +86,9 @@ class Metadata(BaseModel):
     weather_fetch_ms: int = Field(..., description="Tiempo de consulta al API de clima")
     ai_analysis_ms: Optional[int] = Field(None, description="Tiempo de análisis de IA")
     total_ms: int = Field(..., description="Tiempo total de procesamiento")
+    cache_hit: bool = Field(False, description="Datos servidos desde la caché geoespacial")
+    ai_cache_hit: bool = Field(False, description="Análisis de IA servido desde la caché geoespacial")
+    geo_cell: Optional[str] = Field(None, description="Celda geoespacial usada como clave de caché")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -113,6 +140,14 @@ class WeatherResponse(BaseModel):
         }
 
 
+class NearestLocationResponse(BaseModel):
+    """Ubicación conocida más cercana a un punto consultado."""
+    
+    location: Location
+    geo_cell: str = Field(..., description="Celda geoespacial de la ubicación")
+    distance_km: float = Field(..., description="Distancia al punto consultado en km")
+
+
 # ============== ERROR SCHEMAS ==============
 
 class ErrorResponse(BaseModel):
@@ -1,15 +1,70 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime
 import time
 
-from app.models import WeatherRequest, WeatherResponse, Metadata, AIAnalysis, ErrorResponse
+from app.models import (
+    WeatherRequest,
+    WeatherResponse,
+    Metadata,
+    AIAnalysis,
+    NearestLocationResponse,
+    ErrorResponse
+)
 from app.services import get_weather_service, WeatherServiceError
 from app.services import get_ai_service, AIServiceError
+from app.services import get_geo_cache, GeoCacheEntry
 
 
 router = APIRouter(prefix="/api/v1/weather", tags=["Weather"])
 
 
+async def _get_weather_cached(request: WeatherRequest) -> tuple[GeoCacheEntry, str, bool]:
+    """
+    Obtiene el clima usando la caché geoespacial.
+    
+    Las solicitudes por coordenadas se ajustan a su celda y se consulta el
+    centro de la celda, de modo que puntos cercanos comparten resultado.
+    Las solicitudes por ciudad siempre consultan el API, pero registran el
+    resultado en la celda de la ciudad para futuras consultas por coordenadas,
+    conservando el análisis de IA vigente de esa celda.
+    
+    Returns:
+        Tupla con (entrada, celda, cache_hit)
+        
+    Raises:
+        WeatherServiceError: Si hay error en la consulta
+    """
+    weather_service = get_weather_service()
+    geo_cache = get_geo_cache()
+    
+    if request.has_coordinates:
+        cell = geo_cache.cell_for(request.lat, request.lon)
+        
+        entry = geo_cache.get(cell)
+        if entry is not None:
+            return entry, cell, True
+        
+        async def fetch_cell() -> GeoCacheEntry:
+            lat, lon = geo_cache.cell_center(cell)
+            location, weather, weather_fetch_ms = await weather_service.get_weather_by_coords(
+                lat=lat,
+                lon=lon
+            )
+            return geo_cache.set(cell, location, weather, weather_fetch_ms)
+        
+        # Solicitudes concurrentes a la misma celda comparten una sola consulta
+        return await geo_cache.single_flight(cell, fetch_cell), cell, False
+    
+    location, weather, weather_fetch_ms = await weather_service.get_weather(
+        city=request.city,
+        country=request.country
+    )
+    # set() es síncrono (sin await entre lectura y escritura), por lo que no
+    # compite con otras solicitudes de la celda y conserva su análisis vigente
+    cell = geo_cache.cell_for(location.coordinates.lat, location.coordinates.lon)
+    return geo_cache.set(cell, location, weather, weather_fetch_ms), cell, False
+
+
 @router.post(
     "/current",
     response_model=WeatherResponse,
@@ -19,35 +74,33 @@ router = APIRouter(prefix="/api/v1/weather", tags=["Weather"])
         504: {"model": ErrorResponse, "description": "Timeout"}
     },
     summary="Obtener clima actual",
-    description="Obtiene datos del clima para una ciudad usando OpenWeatherMap."
+    description="Obtiene datos del clima para una ciudad o coordenadas usando OpenWeatherMap."
 )
 async def get_current_weather(request: WeatherRequest) -> WeatherResponse:
     """
-    Endpoint para obtener el clima actual de una ciudad.
+    Endpoint para obtener el clima actual de una ciudad o coordenadas.
     
-    - **city**: Nombre de la ciudad (requerido)
+    - **city**: Nombre de la ciudad (requerido si no se envían coordenadas)
     - **country**: Código ISO de 2 letras del país (opcional, ej: BO, US, ES)
+    - **lat** / **lon**: Coordenadas en grados decimales (opcional, van juntas y no se combinan con city/country)
     """
     start_time = time.perf_counter()
     
-    weather_service = get_weather_service()
-    
     try:
-        location, weather, weather_fetch_ms = await weather_service.get_weather(
-            city=request.city,
-            country=request.country
-        )
+        entry, cell, cache_hit = await _get_weather_cached(request)
         
         total_ms = int((time.perf_counter() - start_time) * 1000)
         
         return WeatherResponse(
-            location=location,
-            weather=weather,
+            location=entry.location,
+            weather=entry.weather,
             ai_analysis=None,
             metadata=Metadata(
-                weather_fetch_ms=weather_fetch_ms,
+                weather_fetch_ms=0 if cache_hit else entry.weather_fetch_ms,
                 ai_analysis_ms=None,
                 total_ms=total_ms,
+                cache_hit=cache_hit,
+                geo_cell=cell,
                 timestamp=datetime.utcnow()
             )
         )
@@ -72,57 +125,111 @@ async def get_current_weather(request: WeatherRequest) -> WeatherResponse:
 )
 async def analyze_weather(request: WeatherRequest) -> WeatherResponse:
     """
-    Endpoint para obtener y analizar el clima de una ciudad con IA.
+    Endpoint para obtener y analizar el clima de una ciudad o coordenadas con IA.
     
-    - **city**: Nombre de la ciudad (requerido)
+    - **city**: Nombre de la ciudad (requerido si no se envían coordenadas)
     - **country**: Código ISO de 2 letras del país (opcional, ej: BO, US, ES)
+    - **lat** / **lon**: Coordenadas en grados decimales (opcional, van juntas y no se combinan con city/country)
     """
     start_time = time.perf_counter()
     
-    weather_service = get_weather_service()
     ai_service = get_ai_service()
+    geo_cache = get_geo_cache()
     
     # 1. Obtener datos del clima
     try:
-        location, weather, weather_fetch_ms = await weather_service.get_weather(
-            city=request.city,
-            country=request.country
-        )
+        entry, cell, cache_hit = await _get_weather_cached(request)
     except WeatherServiceError as e:
         raise HTTPException(
             status_code=e.status_code,
             detail=e.message
         )
     
-    # 2. Analizar con IA
+    # 2. Analizar con IA (un solo análisis por celda)
     ai_analysis = None
-    ai_analysis_ms = None
+    ai_analysis_ms = 0
+    ai_cache_hit = False
     
-    try:
-        analysis_dict, ai_analysis_ms = await ai_service.analyze_weather(
-            location=location,
-            weather=weather
+    async def analyze_cell() -> tuple[dict, int]:
+        analysis_dict, elapsed_ms = await ai_service.analyze_weather(
+            location=entry.location,
+            weather=entry.weather
         )
-        ai_analysis = AIAnalysis(**analysis_dict)
-    except AIServiceError as e:
-        print(f"⚠️ Error en análisis de IA: {e.message}")
+        geo_cache.set_analysis(cell, entry, analysis_dict, elapsed_ms)
+        return analysis_dict, elapsed_ms
+    
+    cached_analysis = geo_cache.cached_analysis(entry)
+    
+    if cached_analysis is not None:
+        ai_analysis = AIAnalysis(**cached_analysis)
+        ai_cache_hit = True
+    else:
+        # Solicitudes concurrentes a la misma celda comparten un solo análisis,
+        # incluido su error si Gemini falla
+        try:
+            analysis_dict, ai_analysis_ms = await geo_cache.single_flight(
+                f"ai:{cell}",
+                analyze_cell
+            )
+            ai_analysis = AIAnalysis(**analysis_dict)
+        except AIServiceError as e:
+            ai_analysis_ms = None
+            print(f"⚠️ Error en análisis de IA: {e.message}")
     
     # 3. Construir respuesta
     total_ms = int((time.perf_counter() - start_time) * 1000)
     
     return WeatherResponse(
-        location=location,
-        weather=weather,
+        location=entry.location,
+        weather=entry.weather,
         ai_analysis=ai_analysis,
         metadata=Metadata(
-            weather_fetch_ms=weather_fetch_ms,
+            weather_fetch_ms=0 if cache_hit else entry.weather_fetch_ms,
             ai_analysis_ms=ai_analysis_ms,
             total_ms=total_ms,
+            cache_hit=cache_hit,
+            ai_cache_hit=ai_cache_hit,
+            geo_cell=cell,
             timestamp=datetime.utcnow()
         )
     )
 
 
+@router.get(
+    "/nearest",
+    response_model=NearestLocationResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "Sin ubicaciones en caché"}
+    },
+    summary="Ubicación conocida más cercana",
+    description="Retorna la ubicación cacheada más cercana a unas coordenadas, sin consultar APIs externas."
+)
+async def nearest_location(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180)
+) -> NearestLocationResponse:
+    """
+    Endpoint para obtener la ubicación conocida más cercana a un punto.
+    
+    - **lat** / **lon**: Coordenadas en grados decimales
+    """
+    result = get_geo_cache().nearest(lat, lon)
+    
+    if result is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No hay ubicaciones en caché"
+        )
+    
+    cell, location, distance_km = result
+    
+    return NearestLocationResponse(
+        location=location,
+        geo_cell=cell,
+        distance_km=round(distance_km, 3)
+    )
+
+
 @router.get(
     "/health",
     summary="Health check",
@@ -1,5 +1,6 @@
 from .weather_service import WeatherService, WeatherServiceError, get_weather_service
 from .ai_service import AIService, AIServiceError, get_ai_service
+from .geo_cache import GeoCache, GeoCacheEntry, get_geo_cache
 
 __all__ = [
     "WeatherService",
@@ -7,5 +8,8 @@ __all__ = [
     "get_weather_service",
     "AIService",
     "AIServiceError",
-    "get_ai_service"
+    "get_ai_service",
+    "GeoCache",
+    "GeoCacheEntry",
+    "get_geo_cache"
 ]
\ No newline at end of file
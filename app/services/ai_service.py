@@ -71,7 +71,7 @@ class AIService:
         return f"""Analiza los siguientes datos del clima y responde ÚNICAMENTE con un JSON válido, sin markdown ni texto adicional.
 
 DATOS DEL CLIMA:
-- Ciudad: {location.city}, {location.country}
+- Ciudad: {location.city}{f", {location.country}" if location.country else ""}
 - Temperatura: {weather.temperature}°C
 - Sensación térmica: {weather.feels_like}°C
 - Humedad: {weather.humidity}%
@@ -0,0 +1,365 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from app.config import get_settings
+from app.models import WeatherData, Location
+
+
+T = TypeVar("T")
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_EARTH_RADIUS_KM = 6371.0
+
+
+def geohash_encode(lat: float, lon: float, precision: int) -> str:
+    """Codifica un punto como geohash de `precision` caracteres."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # Los bits pares corresponden a la longitud
+
+    while len(chars) < precision:
+        value, rng = (lon, lon_range) if even else (lat, lat_range)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits = bits << 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_bounds(geohash: str) -> tuple[float, float, float, float]:
+    """Retorna (lat_min, lat_max, lon_min, lon_max) de un geohash."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        index = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (index >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia de gran círculo entre dos puntos en kilómetros."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * _EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+@dataclass
+class GeoCacheEntry:
+    """Resultado cacheado para una celda geoespacial."""
+    location: Location
+    weather: WeatherData
+    weather_fetch_ms: int
+    created_at: float
+    ai_analysis: Optional[dict] = None
+    ai_analysis_ms: Optional[int] = None
+    ai_created_at: Optional[float] = None
+
+
+class GeoCache:
+    """
+    Caché en memoria de clima y análisis de IA por celda geoespacial.
+
+    Las coordenadas se ajustan a una celda (geohash o grilla regular) para
+    que solicitudes cercanas compartan una sola consulta al API de clima y
+    un solo análisis de IA. Además mantiene un índice celda -> Location
+    para responder rápidamente la ubicación conocida más cercana.
+
+    Las entradas se guardan en orden de inserción: las expiradas se
+    descartan desde el frente y, al superar `geo_cache_max_entries`, se
+    descartan las más antiguas.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.mode = self.settings.geo_cache_mode
+        self.precision = self.settings.geo_cache_geohash_precision
+        self.grid_degrees = self.settings.geo_cache_grid_degrees
+        self.ttl = self.settings.geo_cache_ttl_seconds
+        self.max_entries = self.settings.geo_cache_max_entries
+
+        if self.mode not in ("geohash", "grid"):
+            raise ValueError(f"geo_cache_mode inválido: {self.mode}")
+        if not 1 <= self.precision <= 12:
+            raise ValueError(f"geo_cache_geohash_precision inválido: {self.precision}")
+        if self.grid_degrees <= 0:
+            raise ValueError(f"geo_cache_grid_degrees debe ser mayor a 0: {self.grid_degrees}")
+        if self.max_entries < 1:
+            raise ValueError(f"geo_cache_max_entries debe ser mayor a 0: {self.max_entries}")
+
+        # Índice celda -> entrada; cada entrada incluye su Location
+        self._entries: OrderedDict[str, GeoCacheEntry] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    # ---------- Celdas ----------
+
+    def cell_for(self, lat: float, lon: float) -> str:
+        """Retorna la clave de la celda que contiene el punto."""
+        lat = min(max(lat, -90.0), 90.0)
+        lon = (lon + 180.0) % 360.0 - 180.0
+
+        if self.mode == "geohash":
+            return geohash_encode(lat, lon, self.precision)
+
+        # lat=90 cae en una fila inexistente; se asigna a la última fila válida
+        max_lat_idx = math.ceil(90.0 / self.grid_degrees) - 1
+        lat_idx = min(math.floor(lat / self.grid_degrees), max_lat_idx)
+        lon_idx = math.floor(lon / self.grid_degrees)
+        return f"grid:{lat_idx}:{lon_idx}"
+
+    def cell_bounds(self, cell: str) -> tuple[float, float, float, float]:
+        """Retorna (lat_min, lat_max, lon_min, lon_max) de una celda."""
+        if self.mode == "geohash":
+            return geohash_bounds(cell)
+
+        _, lat_idx, lon_idx = cell.split(":")
+        lat_min = int(lat_idx) * self.grid_degrees
+        lon_min = int(lon_idx) * self.grid_degrees
+
+        # Si grid_degrees no divide 180/360, las celdas de borde se recortan
+        # para que el centro sea siempre una coordenada válida
+        return (
+            max(lat_min, -90.0),
+            min(lat_min + self.grid_degrees, 90.0),
+            max(lon_min, -180.0),
+            min(lon_min + self.grid_degrees, 180.0)
+        )
+
+    def cell_center(self, cell: str) -> tuple[float, float]:
+        """Retorna el centro (lat, lon) de una celda."""
+        lat_min, lat_max, lon_min, lon_max = self.cell_bounds(cell)
+        return (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+
+    def _neighbour_cells(self, cell: str) -> set[str]:
+        """Retorna la celda y sus 8 vecinas."""
+        lat_min, lat_max, lon_min, lon_max = self.cell_bounds(cell)
+        lat_c, lon_c = (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+        d_lat, d_lon = lat_max - lat_min, lon_max - lon_min
+
+        return {
+            self.cell_for(lat_c + i * d_lat, lon_c + j * d_lon)
+            for i in (-1, 0, 1)
+            for j in (-1, 0, 1)
+        }
+
+    def _cell_min_side_km(self, cell: str) -> float:
+        """Lado más corto de la celda en km (radio garantizado de búsqueda)."""
+        lat_min, lat_max, lon_min, lon_max = self.cell_bounds(cell)
+        widest_lat = max(abs(lat_min), abs(lat_max))
+        height = haversine_km(lat_min, lon_min, lat_max, lon_min)
+        width = haversine_km(widest_lat, lon_min, widest_lat, lon_max)
+        return min(height, width)
+
+    # ---------- Caché ----------
+
+    async def single_flight(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Ejecuta `factory` una sola vez por clave entre solicitudes concurrentes.
+
+        Las solicitudes que llegan mientras hay una ejecución en curso esperan
+        la misma tarea y reciben su resultado, sea éxito o excepción. La clave
+        se libera al terminar la tarea, por lo que no se acumulan claves.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish_flight(key, t))
+
+        # shield: si un cliente se desconecta, la tarea sigue para los demás
+        return await asyncio.shield(task)
+
+    def _finish_flight(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Marca la excepción como recuperada si nadie quedó esperando
+        if not task.cancelled():
+            task.exception()
+
+    def get(self, cell: str) -> Optional[GeoCacheEntry]:
+        """Retorna la entrada vigente de una celda, si existe."""
+        entry = self._entries.get(cell)
+        if entry is None:
+            return None
+        if self._is_expired(entry):
+            del self._entries[cell]
+            return None
+        return entry
+
+    def set(
+        self,
+        cell: str,
+        location: Location,
+        weather: WeatherData,
+        weather_fetch_ms: int
+    ) -> GeoCacheEntry:
+        """
+        Guarda el clima de una celda y la registra en el índice espacial.
+
+        Si la celda ya tiene un análisis de IA vigente calculado para el mismo
+        clima, se conserva junto con su timestamp original.
+        """
+        self._purge_expired()
+        previous = self.get(cell)
+        entry = GeoCacheEntry(
+            location=location,
+            weather=weather,
+            weather_fetch_ms=weather_fetch_ms,
+            created_at=time.monotonic()
+        )
+        if (
+            previous is not None
+            and previous.weather == weather
+            and self.cached_analysis(previous) is not None
+        ):
+            entry.ai_analysis = previous.ai_analysis
+            entry.ai_analysis_ms = previous.ai_analysis_ms
+            entry.ai_created_at = previous.ai_created_at
+        # Reinsertar al final mantiene el orden por antigüedad
+        self._entries.pop(cell, None)
+        self._entries[cell] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def set_analysis(
+        self,
+        cell: str,
+        entry: GeoCacheEntry,
+        analysis: dict,
+        ai_analysis_ms: int
+    ) -> None:
+        """
+        Guarda el análisis de IA en `entry`.
+
+        Si la entrada vigente de la celda fue reemplazada mientras el análisis
+        estaba en curso, también se guarda ahí, pero solo si tiene el mismo
+        clima que se envió a Gemini.
+        """
+        targets = [entry]
+        current = self.get(cell)
+        if (
+            current is not None
+            and current is not entry
+            and current.weather == entry.weather
+            and self.cached_analysis(current) is None
+        ):
+            targets.append(current)
+
+        created_at = time.monotonic()
+        for target in targets:
+            target.ai_analysis = analysis
+            target.ai_analysis_ms = ai_analysis_ms
+            target.ai_created_at = created_at
+
+    def cached_analysis(self, entry: GeoCacheEntry) -> Optional[dict]:
+        """Retorna el análisis de IA de `entry` si sigue vigente."""
+        if entry.ai_analysis is None or entry.ai_created_at is None:
+            return None
+        if time.monotonic() - entry.ai_created_at > self.ttl:
+            return None
+        return entry.ai_analysis
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float
+    ) -> Optional[tuple[str, Location, float]]:
+        """
+        Busca la ubicación conocida más cercana a un punto.
+
+        Primero revisa la celda del punto y sus vecinas; si el mejor
+        candidato no está dentro del radio garantizado, recorre el índice.
+
+        Returns:
+            Tupla con (celda, Location, distancia_km) o None si no hay datos
+        """
+        self._purge_expired()
+        if not self._entries:
+            return None
+
+        cell = self.cell_for(lat, lon)
+        candidates = [c for c in self._neighbour_cells(cell) if c in self._entries]
+        best = self._closest(lat, lon, candidates)
+
+        if best is None or best[2] > self._cell_min_side_km(cell):
+            best = self._closest(lat, lon, self._entries.keys())
+
+        return best
+
+    def _closest(
+        self,
+        lat: float,
+        lon: float,
+        cells
+    ) -> Optional[tuple[str, Location, float]]:
+        """Retorna el candidato más cercano entre `cells`."""
+        best = None
+        for cell in cells:
+            location = self._entries[cell].location
+            distance = haversine_km(
+                lat, lon,
+                location.coordinates.lat, location.coordinates.lon
+            )
+            if best is None or distance < best[2]:
+                best = (cell, location, distance)
+        return best
+
+    def _is_expired(self, entry: GeoCacheEntry) -> bool:
+        return time.monotonic() - entry.created_at > self.ttl
+
+    def _purge_expired(self) -> None:
+        # Todas las entradas comparten TTL, así que las expiradas están al frente
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if not self._is_expired(entry):
+                break
+            self._entries.popitem(last=False)
+
+
+# Singleton del servicio
+_geo_cache: Optional[GeoCache] = None
+
+
+def get_geo_cache() -> GeoCache:
+    """Obtiene instancia singleton de la caché geoespacial."""
+    global _geo_cache
+    if _geo_cache is None:
+        _geo_cache = GeoCache()
+    return _geo_cache
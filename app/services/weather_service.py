@@ -45,9 +45,43 @@ class WeatherService:
         # Construir query de ubicación
         location_query = f"{city},{country}" if country else city
         
+        return await self._fetch_weather(
+            {"q": location_query},
+            not_found_message=f"Ciudad no encontrada: {city}"
+        )
+    
+    async def get_weather_by_coords(
+        self,
+        lat: float,
+        lon: float
+    ) -> tuple[Location, WeatherData, int]:
+        """
+        Obtiene datos del clima para un par de coordenadas.
+        
+        Args:
+            lat: Latitud en grados decimales
+            lon: Longitud en grados decimales
+            
+        Returns:
+            Tupla con (Location, WeatherData, tiempo_ms)
+            
+        Raises:
+            WeatherServiceError: Si hay error en la consulta
+        """
+        return await self._fetch_weather(
+            {"lat": lat, "lon": lon},
+            not_found_message=f"Ubicación no encontrada: {lat}, {lon}"
+        )
+    
+    async def _fetch_weather(
+        self,
+        query: dict,
+        not_found_message: str
+    ) -> tuple[Location, WeatherData, int]:
+        """Consulta el endpoint /weather y parsea la respuesta."""
         # Parámetros de la API
         params = {
-            "q": location_query,
+            **query,
             "appid": self.api_key,
             "units": "metric",  # Celsius
             "lang": "es"        # Respuestas en español
@@ -67,7 +101,7 @@ class WeatherService:
                 # Manejar errores de la API
                 if response.status_code == 404:
                     raise WeatherServiceError(
-                        f"Ciudad no encontrada: {city}",
+                        not_found_message,
                         status_code=404
                     )
                 elif response.status_code == 401:
@@ -84,13 +118,14 @@ class WeatherService:
                 data = response.json()
                 
                 # Parsear respuesta
+                # Puntos fuera de un país (ej: mar abierto) llegan sin
+                # sys.country y con name vacío
+                lat = data["coord"]["lat"]
+                lon = data["coord"]["lon"]
                 location = Location(
-                    city=data["name"],
-                    country=data["sys"]["country"],
-                    coordinates=Coordinates(
-                        lat=data["coord"]["lat"],
-                        lon=data["coord"]["lon"]
-                    )
+                    city=data.get("name") or f"{lat:.4f}, {lon:.4f}",
+                    country=data.get("sys", {}).get("country"),
+                    coordinates=Coordinates(lat=lat, lon=lon)
                 )
                 
                 weather = WeatherData(
@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+# Settings requiere las API keys; los servicios externos se reemplazan en los tests
+os.environ.setdefault("OPENWEATHER_API_KEY", "test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from app.config import get_settings  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clear_settings():
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
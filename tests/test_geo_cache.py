@@ -0,0 +1,197 @@
+import asyncio
+
+import pytest
+
+from app.config import get_settings
+from app.models import Coordinates, Location, WeatherData
+from app.services.geo_cache import GeoCache, geohash_bounds, geohash_encode
+
+
+def _make_cache(monkeypatch, **env) -> GeoCache:
+    for key, value in env.items():
+        monkeypatch.setenv(key, str(value))
+    get_settings.cache_clear()
+    return GeoCache()
+
+
+@pytest.fixture
+def geohash_cache(monkeypatch) -> GeoCache:
+    return _make_cache(monkeypatch, GEO_CACHE_MODE="geohash", GEO_CACHE_GEOHASH_PRECISION=5)
+
+
+@pytest.fixture
+def grid_cache(monkeypatch) -> GeoCache:
+    return _make_cache(monkeypatch, GEO_CACHE_MODE="grid", GEO_CACHE_GRID_DEGREES=1.0)
+
+
+def _store(cache: GeoCache, lat: float, lon: float, city: str) -> str:
+    cell = cache.cell_for(lat, lon)
+    location = Location(city=city, country="XX", coordinates=Coordinates(lat=lat, lon=lon))
+    weather = WeatherData(
+        temperature=20.0, feels_like=20.0, temp_min=18.0, temp_max=22.0,
+        humidity=50, pressure=1013, description="despejado",
+        wind_speed=1.0, clouds=0
+    )
+    cache.set(cell, location, weather, weather_fetch_ms=10)
+    return cell
+
+
+# ============== GEOHASH ==============
+
+def test_geohash_encode_known_vector():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_geohash_bounds_contain_encoded_point():
+    lat_min, lat_max, lon_min, lon_max = geohash_bounds("u4pruydqqvj")
+
+    assert lat_min <= 57.64911 <= lat_max
+    assert lon_min <= 10.40744 <= lon_max
+    assert lat_max - lat_min < 1e-5
+    assert lon_max - lon_min < 1e-5
+
+
+# ============== GRID ==============
+
+@pytest.mark.parametrize("lat", [90.0, -90.0])
+@pytest.mark.parametrize("degrees", [0.05, 0.07])
+def test_grid_center_at_poles_is_valid(monkeypatch, lat, degrees):
+    cache = _make_cache(monkeypatch, GEO_CACHE_MODE="grid", GEO_CACHE_GRID_DEGREES=degrees)
+
+    center_lat, center_lon = cache.cell_center(cache.cell_for(lat, 0.0))
+
+    assert -90.0 <= center_lat <= 90.0
+    assert abs(center_lat - lat) <= degrees
+
+
+def test_grid_antimeridian_wraps_to_same_cell(grid_cache):
+    assert grid_cache.cell_for(0.5, 180.0) == grid_cache.cell_for(0.5, -180.0)
+    assert grid_cache.cell_center(grid_cache.cell_for(0.5, 180.0)) == (0.5, -179.5)
+
+
+def test_grid_edge_column_is_trimmed(monkeypatch):
+    cache = _make_cache(monkeypatch, GEO_CACHE_MODE="grid", GEO_CACHE_GRID_DEGREES=0.07)
+
+    _, center_lon = cache.cell_center(cache.cell_for(0.0, 179.99))
+
+    assert -180.0 <= center_lon <= 180.0
+
+
+def test_invalid_grid_degrees_rejected(monkeypatch):
+    with pytest.raises(ValueError):
+        _make_cache(monkeypatch, GEO_CACHE_MODE="grid", GEO_CACHE_GRID_DEGREES=0)
+
+
+# ============== NEAREST ==============
+
+def test_nearest_empty_cache(geohash_cache):
+    assert geohash_cache.nearest(0.0, 0.0) is None
+
+
+def test_nearest_across_antimeridian(geohash_cache):
+    _store(geohash_cache, 0.0, -179.99, "Este")
+
+    cell, location, distance_km = geohash_cache.nearest(0.0, 179.99)
+
+    assert location.city == "Este"
+    assert distance_km < 5
+
+
+def test_nearest_uses_neighbour_block(grid_cache):
+    _store(grid_cache, 0.6, 0.6, "Cerca")
+    _store(grid_cache, 40.0, 40.0, "Lejos")
+
+    _, location, _ = grid_cache.nearest(0.5, 0.5)
+
+    assert location.city == "Cerca"
+
+
+def test_nearest_falls_back_to_full_scan(grid_cache):
+    # "Esquina" está dentro del bloque 3x3 pero más lejos (~228 km) que
+    # "Fuera", que está fuera del bloque (~178 km)
+    _store(grid_cache, 1.95, 1.95, "Esquina")
+    _store(grid_cache, 0.5, 2.1, "Fuera")
+
+    _, location, distance_km = grid_cache.nearest(0.5, 0.5)
+
+    assert location.city == "Fuera"
+    assert distance_km == pytest.approx(178, abs=2)
+
+
+def test_nearest_without_neighbours_scans_index(geohash_cache):
+    _store(geohash_cache, -17.78, -63.18, "Santa Cruz")
+
+    _, location, distance_km = geohash_cache.nearest(-16.5, -68.15)
+
+    assert location.city == "Santa Cruz"
+    assert distance_km == pytest.approx(547, abs=2)
+
+
+# ============== LÍMITES ==============
+
+def test_oldest_entries_evicted_past_max_entries(monkeypatch):
+    cache = _make_cache(monkeypatch, GEO_CACHE_MODE="grid", GEO_CACHE_GRID_DEGREES=1.0, GEO_CACHE_MAX_ENTRIES=2)
+
+    first = _store(cache, 0.5, 0.5, "Primera")
+    second = _store(cache, 10.5, 10.5, "Segunda")
+    third = _store(cache, 20.5, 20.5, "Tercera")
+
+    assert cache.get(first) is None
+    assert cache.get(second) is not None
+    assert cache.get(third) is not None
+
+
+def test_refreshed_entry_moves_to_back(monkeypatch):
+    cache = _make_cache(monkeypatch, GEO_CACHE_MODE="grid", GEO_CACHE_GRID_DEGREES=1.0, GEO_CACHE_MAX_ENTRIES=2)
+
+    first = _store(cache, 0.5, 0.5, "Primera")
+    second = _store(cache, 10.5, 10.5, "Segunda")
+    _store(cache, 0.5, 0.5, "Primera")
+    _store(cache, 20.5, 20.5, "Tercera")
+
+    assert cache.get(first) is not None
+    assert cache.get(second) is None
+
+
+# ============== SINGLE FLIGHT ==============
+
+def test_single_flight_shares_result_and_releases_key(geohash_cache):
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def run():
+        shared = await asyncio.gather(
+            *(geohash_cache.single_flight("cell", factory) for _ in range(5))
+        )
+        # Al terminar la tarea la clave se libera y se vuelve a ejecutar
+        await geohash_cache.single_flight("cell", factory)
+        return shared
+
+    assert asyncio.run(run()) == ["ok"] * 5
+    assert calls == 2
+
+
+def test_single_flight_shares_failure(geohash_cache):
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("falla")
+
+    async def run():
+        return await asyncio.gather(
+            *(geohash_cache.single_flight("cell", factory) for _ in range(3)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert calls == 1
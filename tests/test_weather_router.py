@@ -0,0 +1,198 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.routers.weather as weather_module
+from app.config import get_settings
+from app.main import app
+from app.models import Coordinates, Location, WeatherData
+from app.services.geo_cache import GeoCache
+
+
+CITIES = {
+    "La Paz": (-16.5, -68.15),
+}
+
+
+def _weather(temperature: float) -> WeatherData:
+    return WeatherData(
+        temperature=temperature, feels_like=temperature,
+        temp_min=temperature - 2, temp_max=temperature + 2,
+        humidity=50, pressure=1013, description="despejado",
+        wind_speed=1.0, clouds=0, visibility=10000
+    )
+
+
+class FakeWeatherService:
+    """Reemplazo de WeatherService que registra las consultas."""
+
+    def __init__(self):
+        self.calls = []
+        self.temperature = 10.0
+
+    async def get_weather(self, city, country=None):
+        self.calls.append(("city", city))
+        lat, lon = CITIES[city]
+        location = Location(city=city, country="BO", coordinates=Coordinates(lat=lat, lon=lon))
+        return location, _weather(self.temperature), 5
+
+    async def get_weather_by_coords(self, lat, lon):
+        self.calls.append(("coords", lat, lon))
+        location = Location(city="Punto", country="BO", coordinates=Coordinates(lat=lat, lon=lon))
+        return location, _weather(self.temperature), 5
+
+
+class FakeAIService:
+    """Reemplazo de AIService que resume la temperatura recibida."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def analyze_weather(self, location, weather):
+        self.calls += 1
+        analysis = {
+            "summary": f"{weather.temperature}°C",
+            "recommendations": ["Llevar agua"],
+            "risk_level": "low",
+            "risk_factors": []
+        }
+        return analysis, 7
+
+
+@pytest.fixture
+def services(monkeypatch):
+    monkeypatch.setenv("GEO_CACHE_MODE", "geohash")
+    monkeypatch.setenv("GEO_CACHE_GEOHASH_PRECISION", "5")
+    monkeypatch.setenv("GEO_CACHE_TTL_SECONDS", "0.3")
+    get_settings.cache_clear()
+
+    weather_service = FakeWeatherService()
+    ai_service = FakeAIService()
+    geo_cache = GeoCache()
+
+    monkeypatch.setattr(weather_module, "get_weather_service", lambda: weather_service)
+    monkeypatch.setattr(weather_module, "get_ai_service", lambda: ai_service)
+    monkeypatch.setattr(weather_module, "get_geo_cache", lambda: geo_cache)
+
+    return weather_service, ai_service
+
+
+@pytest.fixture
+def client(services) -> TestClient:
+    return TestClient(app)
+
+
+# ============== VALIDACIÓN ==============
+
+@pytest.mark.parametrize("body", [
+    {"lat": -16.5},
+    {"lon": -68.15},
+    {},
+    {"city": "La Paz", "lat": -16.5, "lon": -68.15},
+    {"country": "BO", "lat": -16.5, "lon": -68.15},
+])
+def test_invalid_location_rejected(client, body):
+    response = client.post("/api/v1/weather/current", json=body)
+
+    assert response.status_code == 422
+
+
+# ============== CACHÉ POR CELDA ==============
+
+def test_nearby_points_share_one_fetch(client, services):
+    weather_service, _ = services
+
+    first = client.post("/api/v1/weather/current", json={"lat": -16.50, "lon": -68.15})
+    second = client.post("/api/v1/weather/current", json={"lat": -16.51, "lon": -68.14})
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert len(weather_service.calls) == 1
+    assert first.json()["metadata"]["cache_hit"] is False
+    assert second.json()["metadata"]["cache_hit"] is True
+    assert first.json()["metadata"]["geo_cell"] == "6mpd1"
+    assert second.json()["metadata"]["geo_cell"] == "6mpd1"
+
+
+def test_coordinates_fetch_cell_center(client, services):
+    weather_service, _ = services
+
+    client.post("/api/v1/weather/current", json={"lat": -16.50, "lon": -68.15})
+
+    _, lat, lon = weather_service.calls[0]
+    assert lat == pytest.approx(-16.5014648)
+    assert lon == pytest.approx(-68.1372070)
+
+
+def test_analyze_runs_one_ai_call_per_cell(client, services):
+    _, ai_service = services
+
+    first = client.post("/api/v1/weather/analyze", json={"lat": -16.50, "lon": -68.15})
+    second = client.post("/api/v1/weather/analyze", json={"lat": -16.51, "lon": -68.14})
+    client.post("/api/v1/weather/analyze", json={"lat": -17.78, "lon": -63.18})
+
+    assert ai_service.calls == 2
+    assert first.json()["metadata"]["ai_cache_hit"] is False
+    assert second.json()["metadata"]["ai_cache_hit"] is True
+    assert second.json()["ai_analysis"] == first.json()["ai_analysis"]
+
+
+# ============== REFRESCO POR CIUDAD ==============
+
+def test_city_refresh_keeps_analysis_for_same_weather(client, services):
+    _, ai_service = services
+
+    client.post("/api/v1/weather/analyze", json={"city": "La Paz"})
+    second = client.post("/api/v1/weather/analyze", json={"city": "La Paz"})
+
+    assert ai_service.calls == 1
+    assert second.json()["metadata"]["cache_hit"] is False
+    assert second.json()["metadata"]["ai_cache_hit"] is True
+
+
+def test_city_refresh_drops_analysis_for_new_weather(client, services):
+    weather_service, ai_service = services
+
+    client.post("/api/v1/weather/analyze", json={"city": "La Paz"})
+    weather_service.temperature = 33.0
+    second = client.post("/api/v1/weather/analyze", json={"city": "La Paz"})
+    nearby = client.post("/api/v1/weather/analyze", json={"lat": -16.50, "lon": -68.15})
+
+    assert ai_service.calls == 2
+    assert second.json()["ai_analysis"]["summary"] == "33.0°C"
+    assert second.json()["metadata"]["ai_cache_hit"] is False
+    assert nearby.json()["weather"]["temperature"] == 33.0
+    assert nearby.json()["ai_analysis"]["summary"] == "33.0°C"
+
+
+def test_city_refresh_does_not_extend_analysis_ttl(client, services):
+    _, ai_service = services
+
+    client.post("/api/v1/weather/analyze", json={"city": "La Paz"})
+    time.sleep(0.2)
+    refreshed = client.post("/api/v1/weather/analyze", json={"city": "La Paz"})
+    time.sleep(0.2)
+    expired = client.post("/api/v1/weather/analyze", json={"city": "La Paz"})
+
+    assert refreshed.json()["metadata"]["ai_cache_hit"] is True
+    assert expired.json()["metadata"]["ai_cache_hit"] is False
+    assert ai_service.calls == 2
+
+
+# ============== NEAREST ==============
+
+def test_nearest_empty_cache_returns_404(client):
+    response = client.get("/api/v1/weather/nearest", params={"lat": 0, "lon": 0})
+
+    assert response.status_code == 404
+
+
+def test_nearest_returns_cached_location(client):
+    client.post("/api/v1/weather/current", json={"city": "La Paz"})
+
+    response = client.get("/api/v1/weather/nearest", params={"lat": -16.51, "lon": -68.14})
+
+    assert response.status_code == 200
+    assert response.json()["location"]["city"] == "La Paz"
+    assert response.json()["geo_cell"] == "6mpd1"